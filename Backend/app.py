@@ -1,18 +1,23 @@
 import os
 from flask import Flask, request, jsonify
 from flask_pymongo import PyMongo
+from pymongo.errors import DuplicateKeyError
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from flask_cors import CORS
 from bson.objectid import ObjectId
 from geopy.distance import geodesic
 import datetime
+import math
 from datetime import timedelta
 import requests
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
 import smtplib
+import threading
 from email.message import EmailMessage
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from dotenv import load_dotenv
 
@@ -30,6 +35,9 @@ app.config['TWILIO_ACCOUNT_SID'] = os.getenv("TWILIO_ACCOUNT_SID", "")
 app.config['TWILIO_AUTH_TOKEN'] = os.getenv("TWILIO_AUTH_TOKEN", "")
 app.config['TWILIO_NUMBER'] = os.getenv("TWILIO_NUMBER", "") 
 
+# Send notifications in the background so alert creation returns immediately
+app.config["ASYNC_NOTIFICATIONS"] = os.getenv("ASYNC_NOTIFICATIONS", "True").lower() == "true"
+
 # Logic Constants (Mock Values / Settings)
 CONSTANTS = {
     "SMS_RADIUS_KM": 200,          
@@ -38,13 +46,36 @@ CONSTANTS = {
     "DEFAULT_LAT": 20.5937,        # Center of India Lat
     "DEFAULT_LNG": 78.9629,        # Center of India Lng
     "USER_AGENT": "DisasterWatchApp/1.0",
-    "MAX_ROUNDS": 5
+    "MAX_ROUNDS": 5,
+    "EARTH_RADIUS_KM": 6371.0088,  # IUGG mean radius used by haversine_km
+    "KM_PER_DEGREE_LAT": 110.574,  # Shortest degree of latitude (equator); keeps bounding boxes conservative
+    "NOTIFICATION_WORKERS": 4,     # Background threads for alert fan-out
+    "BROADCAST_WORKERS": 10        # Threads per broadcast, and the process-wide cap on in-flight sends per provider
 }
 
 mongo = PyMongo(app)
 bcrypt = Bcrypt(app)
 jwt = JWTManager(app)
 CORS(app) 
+notification_executor = ThreadPoolExecutor(max_workers=CONSTANTS["NOTIFICATION_WORKERS"])
+# Concurrent dispatches each run their own broadcast pools; these cap provider calls across all of them
+sms_send_slots = threading.BoundedSemaphore(CONSTANTS["BROADCAST_WORKERS"])
+email_send_slots = threading.BoundedSemaphore(CONSTANTS["BROADCAST_WORKERS"])
+
+
+def ensure_indexes():
+    """Create the indexes the hot queries rely on. Idempotent; safe on every start."""
+    # Separate tries: one index failing (e.g. duplicate emails already stored) must not skip the other
+    try:
+        # Signup/login look users up by email; unique also closes the signup race
+        mongo.db.users.create_index("email", unique=True)
+    except Exception as e:
+        print(f"Error ensuring users.email index: {e}")
+    try:
+        # Duplicate checks and the feed both filter/sort recent alerts by time
+        mongo.db.alerts.create_index([("timestamp", -1)])
+    except Exception as e:
+        print(f"Error ensuring alerts.timestamp index: {e}")
 
 
 def ensure_admin_user():
@@ -81,24 +112,31 @@ def ensure_admin_user():
         print(f"Error ensuring admin user: {e}")
 
 
+@lru_cache(maxsize=4096)
+def lookup_coordinates(city, state, country):
+    """
+    Queries OpenStreetMap for (lat, lng). Memoized: repeat places skip the network.
+    Raises on failure or no match, so only successful lookups are cached.
+    """
+    query = f"{city}, {state}, {country}"
+    headers = { 'User-Agent': CONSTANTS["USER_AGENT"] }
+    url = "https://nominatim.openstreetmap.org/search"
+    params = { 'q': query, 'format': 'json', 'limit': 1 }
+    
+    response = requests.get(url, params=params, headers=headers)
+    data = response.json()
+    
+    if not data:
+        raise LookupError(f"No geocoding match for {query!r}")
+    return float(data[0]['lat']), float(data[0]['lon'])
+
 def get_coordinates(city, state, country="India"):
     """Fetches Latitude and Longitude from OpenStreetMap."""
     try:
-        query = f"{city}, {state}, {country}"
-        headers = { 'User-Agent': CONSTANTS["USER_AGENT"] }
-        url = "https://nominatim.openstreetmap.org/search"
-        params = { 'q': query, 'format': 'json', 'limit': 1 }
-        
-        response = requests.get(url, params=params, headers=headers)
-        data = response.json()
-        
-        if data and len(data) > 0:
-            return {
-                "lat": float(data[0]['lat']),
-                "lng": float(data[0]['lon'])
-            }
+        lat, lng = lookup_coordinates(city, state, country)
+        return {"lat": lat, "lng": lng}
+    except LookupError:
         return {"lat": CONSTANTS["DEFAULT_LAT"], "lng": CONSTANTS["DEFAULT_LNG"]}
-        
     except Exception as e:
         print(f"Geocoding error: {e}")
         return {"lat": CONSTANTS["DEFAULT_LAT"], "lng": CONSTANTS["DEFAULT_LNG"]}
@@ -115,63 +153,113 @@ def user_serializer(user):
         "notificationPreferences": user.get("notificationPreferences", {}),
     }
 
-def send_twilio_sms(to_number, title, message_body):
-    """Sends SMS via Twilio."""
+def get_twilio_client():
+    """Builds a Twilio client from the configured credentials."""
+    return Client(app.config['TWILIO_ACCOUNT_SID'], app.config['TWILIO_AUTH_TOKEN'])
+
+def send_twilio_sms(to_number, title, message_body, client=None):
+    """Sends SMS via Twilio. Pass `client` to reuse one across many messages."""
     formatted_number = to_number.strip()
     if not formatted_number.startswith('+'):
         formatted_number = f"+91{formatted_number}" # Default to India +91
 
     final_message = f"🚨 {title.upper()} 🚨\n{message_body}\n- DisasterWatch Team"
-    client = Client(app.config['TWILIO_ACCOUNT_SID'], app.config['TWILIO_AUTH_TOKEN'])
+    if client is None:
+        client = get_twilio_client()
 
     try:
-        message = client.messages.create(
-            body=final_message,
-            from_=app.config['TWILIO_NUMBER'],
-            to=formatted_number
-        )
+        with sms_send_slots:
+            message = client.messages.create(
+                body=final_message,
+                from_=app.config['TWILIO_NUMBER'],
+                to=formatted_number
+            )
         return {"status": "success", "sid": message.sid}
     except TwilioRestException as e:
         print(f"Twilio Error for {formatted_number}: {e}")
         return {"status": "error", "message": str(e)}
 
-def should_trigger_sms(new_alert_coords):
+def haversine_km(lat1, lng1, lat2, lng2):
     """
-    Checks if a similar alert (SMS sent) exists within 
-    RADIUS and TIME WINDOW.
-    Returns: Boolean (True = Send SMS, False = Suppress)
+    Great-circle distance in km on a spherical Earth.
+    Within ~0.5% of geodesic() and far cheaper, for screening many users per alert.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * CONSTANTS["EARTH_RADIUS_KM"] * math.asin(math.sqrt(a))
+
+def should_trigger_notifications(new_alert_coords, now=None):
+    """
+    Checks recent alerts once for both SMS and email suppression.
+    A channel is suppressed when a recent alert (within DUPLICATE_TIME_WINDOW_HOURS)
+    that already used it exists within DUPLICATE_CHECK_RADIUS_KM.
+    `now` lets the caller share one clock reading with the alert it stores.
+    Returns: Tuple (trigger_sms, trigger_email)
     """
     try:
         alerts_collection = mongo.db.alerts
-        
-        #  Define Time Window
-        time_threshold = datetime.datetime.utcnow() - timedelta(hours=CONSTANTS["DUPLICATE_TIME_WINDOW_HOURS"])
-        
-        #  Query for recent alerts where SMS was actually sent
-        recent_active_alerts = alerts_collection.find({
+        if now is None:
+            now = datetime.datetime.utcnow()
+        time_threshold = now - timedelta(hours=CONSTANTS["DUPLICATE_TIME_WINDOW_HOURS"])
+
+        # Nothing outside this latitude band can be within the radius, so let
+        # the database drop it instead of running geodesic() on every row
+        lat_delta = CONSTANTS["DUPLICATE_CHECK_RADIUS_KM"] / CONSTANTS["KM_PER_DEGREE_LAT"]
+
+        # One query covers both channels instead of one query per channel
+        recent_alerts = alerts_collection.find({
             "timestamp": {"$gte": time_threshold},
-            "sms_sent": True  # Only check alerts that triggered SMS
+            "coordinates.lat": {
+                "$gte": new_alert_coords['lat'] - lat_delta,
+                "$lte": new_alert_coords['lat'] + lat_delta
+            },
+            "$or": [{"sms_sent": True}, {"email_sent": True}]
         })
 
         new_point = (new_alert_coords['lat'], new_alert_coords['lng'])
+        trigger_sms = True
+        trigger_email = True
+
+        for existing_alert in recent_alerts:
+            sms_match = trigger_sms and existing_alert.get('sms_sent', False)
+            email_match = trigger_email and existing_alert.get('email_sent', False)
+            if not (sms_match or email_match):
+                continue
 
-        #  Check Distance for each recent alert
-        for existing_alert in recent_active_alerts:
             existing_coords = existing_alert.get('coordinates')
-            if existing_coords and 'lat' in existing_coords:
-                existing_point = (existing_coords['lat'], existing_coords['lng'])
-                
-                distance = geodesic(new_point, existing_point).km
-                
-                if distance <= CONSTANTS["DUPLICATE_CHECK_RADIUS_KM"]:
-                    print(f" SMS Suppressed: Similar alert found {distance:.2f}km away.")
-                    return False # Found a match, DO NOT send SMS
+            if not existing_coords or 'lat' not in existing_coords or 'lng' not in existing_coords:
+                continue
+
+            existing_point = (existing_coords['lat'], existing_coords['lng'])
+            distance_km = geodesic(new_point, existing_point).km
 
-        return True # No matching alert found, proceed with SMS
+            if distance_km <= CONSTANTS["DUPLICATE_CHECK_RADIUS_KM"]:
+                if sms_match:
+                    print(f" SMS Suppressed: Similar alert found {distance_km:.2f}km away.")
+                    trigger_sms = False
+                if email_match:
+                    print(f" Email Suppressed: Similar alert found {distance_km:.2f} km away.")
+                    trigger_email = False
+
+            if not (trigger_sms or trigger_email):
+                break
+
+        return trigger_sms, trigger_email
 
     except Exception as e:
+        # Fail-safe: if suppression check fails, allow sending (avoid silent missed alerts)
         print(f"Error in suppression logic: {e}")
-        return True # Fail-safe: Send SMS if check fails
+        return True, True
+
+def should_trigger_sms(new_alert_coords):
+    """
+    Checks if a similar alert (SMS sent) exists within 
+    RADIUS and TIME WINDOW.
+    Returns: Boolean (True = Send SMS, False = Suppress)
+    """
+    return should_trigger_notifications(new_alert_coords)[0]
 
 def should_trigger_email(new_alert_coords):
     """
@@ -179,82 +267,79 @@ def should_trigger_email(new_alert_coords):
     Suppresses sending when a recent alert (within DUPLICATE_TIME_WINDOW_HOURS)
     that already had email_sent=True exists within DUPLICATE_CHECK_RADIUS_KM.
     """
-    try:
-        alerts_collection = mongo.db.alerts
-        time_threshold = datetime.datetime.utcnow() - timedelta(hours=CONSTANTS["DUPLICATE_TIME_WINDOW_HOURS"])
+    return should_trigger_notifications(new_alert_coords)[1]
 
-        # Only consider alerts that previously had emails actually sent
-        recent_email_alerts = alerts_collection.find({
-            "timestamp": {"$gte": time_threshold},
-            "email_sent": True
-        })
 
-        new_point = (new_alert_coords['lat'], new_alert_coords['lng'])
+def find_alert_recipients(alert_data):
+    """
+    Single pass over users within SMS_RADIUS_KM of the alert.
+    Returns: Tuple (sms_recipients, email_recipients)
+    """
+    alert_lat = alert_data['coordinates']['lat']
+    alert_lng = alert_data['coordinates']['lng']
 
-        for existing_alert in recent_email_alerts:
-            existing_coords = existing_alert.get('coordinates')
-            if not existing_coords or 'lat' not in existing_coords or 'lng' not in existing_coords:
-                continue
+    sms_recipients = []
+    email_recipients = []
+    for user in mongo.db.users.find({}):
+        user_loc = user.get('location', {})
+        user_coords = user_loc.get('coordinates')
+        if not user_coords or 'lat' not in user_coords:
+            continue
 
-            existing_point = (existing_coords['lat'], existing_coords['lng'])
-            distance_km = geodesic(new_point, existing_point).km
+        # Distance is computed once per user and shared by both channels
+        distance_km = haversine_km(alert_lat, alert_lng, user_coords['lat'], user_coords['lng'])
+        if distance_km > CONSTANTS["SMS_RADIUS_KM"]:
+            continue
 
-            if distance_km <= CONSTANTS["DUPLICATE_CHECK_RADIUS_KM"]:
-                print(f" Email Suppressed: Similar alert found {distance_km:.2f} km away.")
-                return False
+        if user.get("phone"):
+            sms_recipients.append(user)
 
-        return True
+        # Skip email if user opted out
+        prefs = user.get("notificationPreferences", {})
+        if user.get("email") and prefs.get("email") is not False:
+            email_recipients.append(user)
 
-    except Exception as e:
-        # Fail-safe: if suppression check fails, allow sending (avoid silent missed alerts)
-        print(f"Error in email suppression logic: {e}")
-        return True
+    return sms_recipients, email_recipients
 
+def broadcast_pool_size(recipients):
+    """Thread count for one broadcast: no more than BROADCAST_WORKERS, at least one."""
+    return max(1, min(CONSTANTS["BROADCAST_WORKERS"], len(recipients)))
 
-def broadcast_sms_to_users(alert_data):
+def broadcast_sms_to_users(alert_data, recipients=None):
     """Iterates users and sends SMS if within radius."""
     
     try:
-        # 1. Fetch all users
-        # Convert cursor to list immediately to avoid cursor exhaustion issues
-        all_users = list(mongo.db.users.find({}))
-        
-        alert_point = (alert_data['coordinates']['lat'], alert_data['coordinates']['lng'])
-        
-        # 2. FILTER FIRST: Identify who actually needs the SMS
-        # This saves CPU by doing the math only once per user
-        recipients = []
-        for user in all_users:
-            user_loc = user.get('location', {})
-            user_coords = user_loc.get('coordinates')
-            
-            if user_coords and 'lat' in user_coords:
-                user_point = (user_coords['lat'], user_coords['lng'])
-                if geodesic(alert_point, user_point).km <= CONSTANTS["SMS_RADIUS_KM"]:
-                    if user.get("phone"):
-                        recipients.append(user)
+        # 1. FILTER FIRST: Identify who actually needs the SMS
+        # (create_alert passes recipients it already computed for both channels)
+        if recipients is None:
+            recipients = find_alert_recipients(alert_data)[0]
+
+        # One Twilio client (and HTTP session) per pool thread, reused across messages and rounds;
+        # the client stores per-request state and requests.Session is not thread-safe
+        has_credentials = bool(app.config['TWILIO_ACCOUNT_SID'] and app.config['TWILIO_AUTH_TOKEN'])
+        worker = threading.local()
+
+        def init_worker():
+            worker.client = get_twilio_client() if has_credentials else None
+
+        def send_one(user):
+            return send_twilio_sms(user.get("phone"), alert_data['title'], alert_data['message'], client=worker.client)
 
         curr_round = 0
         users_to_process = recipients 
         success_count = 0
 
-        while curr_round < CONSTANTS["MAX_ROUNDS"] and len(users_to_process) > 0:
-          
-            
-            failed_in_this_round = [] 
-            for user in users_to_process:
-                phone = user.get("phone")
-                
-                # Send SMS
-                response = send_twilio_sms(phone, alert_data['title'], alert_data['message'])
-                
-                if response['status'] == 'success':
-                    success_count += 1
-                else:
-                    
-                    failed_in_this_round.append(user)
-            users_to_process = failed_in_this_round
-            curr_round += 1
+        # Sends are network-bound, so threads overlap them; sms_send_slots caps provider load across broadcasts
+        with ThreadPoolExecutor(max_workers=broadcast_pool_size(recipients), initializer=init_worker) as pool:
+            while curr_round < CONSTANTS["MAX_ROUNDS"] and len(users_to_process) > 0:
+                failed_in_this_round = [] 
+                for user, response in zip(users_to_process, pool.map(send_one, users_to_process)):
+                    if response['status'] == 'success':
+                        success_count += 1
+                    else:
+                        failed_in_this_round.append(user)
+                users_to_process = failed_in_this_round
+                curr_round += 1
         
         print(f" SMS Broadcast Complete: Sent to {success_count} users.")
         return True
@@ -262,67 +347,58 @@ def broadcast_sms_to_users(alert_data):
         print(f" SMS Broadcast Failed: {e}")
         return False
     
-def broadcast_email_to_users(alert_data):
+def broadcast_email_to_users(alert_data, recipients=None):
     """Iterate users and send email alerts to those within radius and who opted-in."""
     try:
-        all_users = list(mongo.db.users.find({}))
-        alert_point = (alert_data['coordinates']['lat'], alert_data['coordinates']['lng'])
-
         # 1) Build recipient list (respect user notification preferences)
-        recipients = []
-        for user in all_users:
-            prefs = user.get("notificationPreferences", {})
-            # Skip if user opted out of email
-            if prefs.get("email") is False:
-                continue
-
-            user_loc = user.get("location", {})
-            user_coords = user_loc.get("coordinates")
-            if user_coords and 'lat' in user_coords:
-                user_point = (user_coords['lat'], user_coords['lng'])
-                if geodesic(alert_point, user_point).km <= CONSTANTS["SMS_RADIUS_KM"]:
-                    if user.get("email"):
-                        recipients.append(user)
+        if recipients is None:
+            recipients = find_alert_recipients(alert_data)[1]
+
+        def send_one(user):
+            to_email = user.get("email")
+            try:
+                # Build email
+                msg = EmailMessage()
+                msg["Subject"] = f"🚨 {alert_data['title'].upper()} 🚨"
+                msg["From"] = app.config.get("FROM_EMAIL") or app.config.get("SMTP_USER")
+                msg["To"] = to_email
+                body = f"{alert_data.get('message','')}\n\nLocation: {alert_data.get('location')}\n- DisasterWatch Team"
+                msg.set_content(body)
+
+                # SMTP send
+                smtp_host = app.config.get("SMTP_HOST")
+                smtp_port = int(app.config.get("SMTP_PORT", 587))
+                smtp_user = app.config.get("SMTP_USER")
+                smtp_pass = app.config.get("SMTP_PASSWORD")
+                use_tls = app.config.get("SMTP_USE_TLS", True)
+
+                with email_send_slots, smtplib.SMTP(smtp_host, smtp_port, timeout=15) as server:
+                    if use_tls:
+                        server.starttls()
+                    if smtp_user and smtp_pass:
+                        server.login(smtp_user, smtp_pass)
+                    server.send_message(msg)
+                return True
+            except Exception as e:
+                print(f" Email failed for {to_email}: {e}")
+                return False
 
         # 2) Retry loop (same logic as broadcast_sms_to_users)
         curr_round = 0
         users_to_process = recipients
         success_count = 0
 
-        while curr_round < CONSTANTS["MAX_ROUNDS"] and len(users_to_process) > 0:
-            failed_in_this_round = []
-            for user in users_to_process:
-                to_email = user.get("email")
-                try:
-                    # Build email
-                    msg = EmailMessage()
-                    msg["Subject"] = f"🚨 {alert_data['title'].upper()} 🚨"
-                    msg["From"] = app.config.get("FROM_EMAIL") or app.config.get("SMTP_USER")
-                    msg["To"] = to_email
-                    body = f"{alert_data.get('message','')}\n\nLocation: {alert_data.get('location')}\n- DisasterWatch Team"
-                    msg.set_content(body)
-
-                    # SMTP send
-                    smtp_host = app.config.get("SMTP_HOST")
-                    smtp_port = int(app.config.get("SMTP_PORT", 587))
-                    smtp_user = app.config.get("SMTP_USER")
-                    smtp_pass = app.config.get("SMTP_PASSWORD")
-                    use_tls = app.config.get("SMTP_USE_TLS", True)
-
-                    with smtplib.SMTP(smtp_host, smtp_port, timeout=15) as server:
-                        if use_tls:
-                            server.starttls()
-                        if smtp_user and smtp_pass:
-                            server.login(smtp_user, smtp_pass)
-                        server.send_message(msg)
-
-                    success_count += 1
-                except Exception as e:
-                    print(f" Email failed for {to_email}: {e}")
-                    failed_in_this_round.append(user)
-
-            users_to_process = failed_in_this_round
-            curr_round += 1
+        with ThreadPoolExecutor(max_workers=broadcast_pool_size(recipients)) as pool:
+            while curr_round < CONSTANTS["MAX_ROUNDS"] and len(users_to_process) > 0:
+                failed_in_this_round = []
+                for user, sent in zip(users_to_process, pool.map(send_one, users_to_process)):
+                    if sent:
+                        success_count += 1
+                    else:
+                        failed_in_this_round.append(user)
+
+                users_to_process = failed_in_this_round
+                curr_round += 1
 
         print(f" Email Broadcast Complete: Sent to {success_count} users.")
         return True
@@ -331,6 +407,20 @@ def broadcast_email_to_users(alert_data):
         print(f" Email Broadcast Failed: {e}")
         return False
 
+def dispatch_alert_notifications(alert_data, trigger_sms, trigger_email):
+    """Broadcast SMS and email (first sms), filtering users only once."""
+    try:
+        sms_recipients, email_recipients = find_alert_recipients(alert_data)
+    except Exception as e:
+        print(f" Recipient lookup failed: {e}")
+        return
+
+    if trigger_sms:
+        broadcast_sms_to_users(alert_data, recipients=sms_recipients)
+
+    if trigger_email:
+        broadcast_email_to_users(alert_data, recipients=email_recipients)
+
 # --- 3. ROUTES ---
 
 @app.route('/api/signup', methods=['POST'])
@@ -361,11 +451,16 @@ def signup():
         "created_at": datetime.datetime.utcnow()
     }
 
-    result = users.insert_one(new_user)
+    try:
+        result = users.insert_one(new_user)
+    except DuplicateKeyError:
+        # Lost the race to a concurrent signup; the unique email index rejected this one
+        return jsonify({"msg": "User already exists"}), 400
+    # The inserted document is already in hand; skip a find_one round trip
+    new_user["_id"] = result.inserted_id
     access_token = create_access_token(identity=str(result.inserted_id))
-    created_user = users.find_one({"_id": result.inserted_id})
     
-    return jsonify({ "token": access_token, "user": user_serializer(created_user) }), 201
+    return jsonify({ "token": access_token, "user": user_serializer(new_user) }), 201
 
 @app.route('/api/login', methods=['POST'])
 def login():
@@ -466,8 +561,9 @@ def create_alert():
         state = parts[1].strip() if len(parts) > 1 else ""
         alert_coords = get_coordinates(city, state)
 
-    trigger_sms = should_trigger_sms(alert_coords)
-    trigger_email = should_trigger_email(alert_coords)
+    # One clock reading for both the duplicate window and the stored timestamp
+    now = datetime.datetime.utcnow()
+    trigger_sms, trigger_email = should_trigger_notifications(alert_coords, now=now)
 
     # 2. Create Alert Object
     new_alert = {
@@ -479,25 +575,24 @@ def create_alert():
         "location": data['location'],
         "coordinates": alert_coords,
         "status": "active",
-        "timestamp": datetime.datetime.utcnow(),
+        "timestamp": now,
         "sms_sent": trigger_sms,
         "email_sent": trigger_email
     }
 
     result = mongo.db.alerts.insert_one(new_alert)
+    # The stored document is already in hand; no find_one round trip to return it
+    new_alert["_id"] = result.inserted_id
 
-    # 3. Broadcast SMS and email (first sms)
-    if trigger_sms:
-        broadcast_sms_to_users(new_alert)
+    # 3. Broadcast SMS and email; a slow or failing gateway must not delay the response
+    if trigger_sms or trigger_email:
+        if app.config["ASYNC_NOTIFICATIONS"]:
+            notification_executor.submit(dispatch_alert_notifications, new_alert, trigger_sms, trigger_email)
+        else:
+            dispatch_alert_notifications(new_alert, trigger_sms, trigger_email)
 
-    if trigger_email:
-        broadcast_email_to_users(new_alert)
-
-    # 4. Fetch the fresh document to return it safely
-    saved_alert = mongo.db.alerts.find_one({"_id": result.inserted_id})
-    
-    # USE THE SERIALIZER
-    return jsonify(serialize_alert(saved_alert)), 201
+    # 4. USE THE SERIALIZER
+    return jsonify(serialize_alert(new_alert)), 201
 
 
 @app.route('/api/alerts', methods=['GET'])
@@ -530,5 +625,6 @@ def get_alerts():
 
 if __name__ == '__main__':
     with app.app_context():
+        ensure_indexes()
         ensure_admin_user()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
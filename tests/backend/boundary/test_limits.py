@@ -10,48 +10,34 @@ Reference: IEEE 829 Test Case Specification, ISTQB Boundary Value Analysis
 """
 
 import pytest
-import sys
-from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 from bson.objectid import ObjectId
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "Backend"))
-
 
+@pytest.mark.slow
 class TestUserInputBoundaries:
     """
     Test Suite: User Registration Input Boundary Values
     Tests validation of user input fields at boundary conditions.
+    Signups hash with real bcrypt, so this suite dominates the run time.
     """
     
     @pytest.fixture(autouse=True)
-    def setup(self):
+    def setup(self, flask_app, client, mock_mongo, mock_geocoding, signup_factory):
         """Setup test client with mocked dependencies."""
-        # Patch mongo before importing app
-        self.mongo_patcher = patch('app.mongo')
-        self.geocoding_patcher = patch('app.requests.get')
-        
-        self.mock_mongo = self.mongo_patcher.start()
-        self.mock_geocoding = self.geocoding_patcher.start()
+        self.users = mock_mongo.db.users
         
         # Setup default mongo mock behavior
-        self.mock_mongo.db.users.find_one.return_value = None
-        self.mock_mongo.db.users.insert_one.return_value = MagicMock(inserted_id=ObjectId())
-        
-        # Setup geocoding mock
-        mock_response = MagicMock()
-        mock_response.json.return_value = [{"lat": "19.0760", "lon": "72.8777"}]
-        self.mock_geocoding.return_value = mock_response
-        
-        from app import app
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-        self.app = app
-        
-        yield
+        self.users.find_one.return_value = None
+        self.users.insert_one.return_value = MagicMock(inserted_id=ObjectId())
         
-        self.mongo_patcher.stop()
-        self.geocoding_patcher.stop()
+        self.client = client
+        self.app = flask_app
+        self.signup_factory = signup_factory
+    
+    def _signup(self, **overrides):
+        """POST /api/signup with a valid body, overriding only the field under test."""
+        return self.client.post('/api/signup', json=self.signup_factory(**overrides))
     
     # =========================================================================
     # BVA-001: Email Format Boundaries
@@ -72,32 +58,7 @@ class TestUserInputBoundaries:
         Priority: P1 - Critical
         Tests email format validation at boundaries.
         """
-        user_id = ObjectId()
-        
-        # Setup mock to return created user after insert
-        self.mock_mongo.db.users.find_one.side_effect = [
-            None,  # Check if exists
-            {      # Return after insert
-                "_id": user_id,
-                "name": "Test User",
-                "email": email,
-                "phone": "+919876543210",
-                "location": {"city": "Mumbai", "state": "Maharashtra", "coordinates": {"lat": 19.0, "lng": 72.8}},
-                "isAuthorized": False,
-                "notificationPreferences": {"email": True, "sms": True, "push": True}
-            }
-        ]
-        
-        data = {
-            "name": "Test User",
-            "email": email,
-            "password": "ValidPass123!",
-            "phone": "+919876543210",
-            "city": "Mumbai",
-            "state": "Maharashtra"
-        }
-        
-        response = self.client.post('/api/signup', json=data)
+        response = self._signup(email=email)
         
         if should_pass:
             assert response.status_code in [201, 400, 500]
@@ -120,31 +81,7 @@ class TestUserInputBoundaries:
         Priority: P2 - High
         Tests phone number length validation at boundaries.
         """
-        user_id = ObjectId()
-        
-        self.mock_mongo.db.users.find_one.side_effect = [
-            None,
-            {
-                "_id": user_id,
-                "name": "Test User",
-                "email": "test@example.com",
-                "phone": phone,
-                "location": {},
-                "isAuthorized": False,
-                "notificationPreferences": {}
-            }
-        ]
-        
-        data = {
-            "name": "Test User",
-            "email": "test@example.com",
-            "password": "ValidPass123!",
-            "phone": phone,
-            "city": "Mumbai",
-            "state": "Maharashtra"
-        }
-        
-        response = self.client.post('/api/signup', json=data)
+        response = self._signup(phone=phone)
         assert response.status_code in [201, 400, 422, 500]
     
     # =========================================================================
@@ -161,31 +98,7 @@ class TestUserInputBoundaries:
         Priority: P1 - Critical
         Tests password length validation at boundaries.
         """
-        user_id = ObjectId()
-        
-        self.mock_mongo.db.users.find_one.side_effect = [
-            None,
-            {
-                "_id": user_id,
-                "name": "Test User",
-                "email": "test@example.com",
-                "phone": "+919876543210",
-                "location": {},
-                "isAuthorized": False,
-                "notificationPreferences": {}
-            }
-        ]
-        
-        data = {
-            "name": "Test User",
-            "email": "test@example.com",
-            "password": password,
-            "phone": "+919876543210",
-            "city": "Mumbai",
-            "state": "Maharashtra"
-        }
-        
-        response = self.client.post('/api/signup', json=data)
+        response = self._signup(password=password)
         assert response.status_code in [201, 400, 500]
     
     # =========================================================================
@@ -203,31 +116,7 @@ class TestUserInputBoundaries:
         Priority: P2 - High
         Tests name field validation at boundaries.
         """
-        user_id = ObjectId()
-        
-        self.mock_mongo.db.users.find_one.side_effect = [
-            None,
-            {
-                "_id": user_id,
-                "name": name,
-                "email": "test@example.com",
-                "phone": "+919876543210",
-                "location": {},
-                "isAuthorized": False,
-                "notificationPreferences": {}
-            }
-        ]
-        
-        data = {
-            "name": name,
-            "email": "test@example.com",
-            "password": "ValidPass123!",
-            "phone": "+919876543210",
-            "city": "Mumbai",
-            "state": "Maharashtra"
-        }
-        
-        response = self.client.post('/api/signup', json=data)
+        response = self._signup(name=name)
         assert response.status_code in [201, 400, 422, 500]
 
 
@@ -5,15 +5,59 @@ Provides shared fixtures for all Backend API test modules.
 Tests the Backend Flask API (Backend/app.py)
 """
 
+import itertools
 import os
 import sys
+import threading
 import pytest
+from collections import deque
 from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import MagicMock, patch
+from bson.objectid import ObjectId
 
 # Add Backend to path
 backend_path = Path(__file__).parent.parent.parent / "Backend"
 sys.path.insert(0, str(backend_path))
 
+# Tests run against mocks only; point the app at a throwaway database that
+# fails fast (instead of pymongo's 30s default) if a call ever slips through
+os.environ.setdefault(
+    "MONGO_URI",
+    "mongodb://localhost:27017/das_test?serverSelectionTimeoutMS=500&connectTimeoutMS=500"
+)
+
+# Monotonic source for next_object_id; unique for the whole session
+_object_id_counter = itertools.count(1)
+
+
+def _counter_object_id():
+    """Build an ObjectId from the session counter (no clock, random or lock)."""
+    return ObjectId(next(_object_id_counter).to_bytes(12, "big"))
+
+
+# Reusable ids for mock documents whose identity no test asserts on
+USER_OID = _counter_object_id()
+ALERT_OID = _counter_object_id()
+
+# Read-only base payloads for signup_factory / alert_factory
+_SIGNUP_DEFAULTS = MappingProxyType({
+    "name": "Test User",
+    "email": "test@example.com",
+    "password": "SecurePass123!",
+    "phone": "+919876543210",
+    "city": "Mumbai",
+    "state": "Maharashtra"
+})
+_ALERT_DEFAULTS = MappingProxyType({
+    "title": "Flood Warning",
+    "message": "Heavy flooding expected",
+    "type": "flood",
+    "severity": "high",
+    "location": "Mumbai, Maharashtra",
+    "coordinates": MappingProxyType({"lat": 19.0760, "lng": 72.8777})
+})
+
 
 # Test markers configuration
 def pytest_configure(config):
@@ -35,44 +79,163 @@ def pytest_configure(config):
     )
 
 
+@pytest.fixture(scope="session")
+def flask_app():
+    """Provide the Flask app, configured for testing once per session."""
+    from app import app
+    app.config['TESTING'] = True
+    # Run notification fan-out inline so mocks are still active when it runs
+    app.config['ASYNC_NOTIFICATIONS'] = False
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(flask_app):
+    """Provide one test client for the session; auth is header-based, so no cookie state carries over."""
+    return flask_app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def clear_geocoding_cache():
+    """Start every test with an empty geocoding cache so patched responses don't leak."""
+    from app import lookup_coordinates
+    lookup_coordinates.cache_clear()
+
+
+@pytest.fixture
+def mock_mongo():
+    """Patch app.mongo for the duration of a test. Opt-in: only storage tests request it."""
+    with patch('app.mongo') as mocked:
+        yield mocked
+
+
+@pytest.fixture
+def mock_geocoding(monkeypatch):
+    """Replace the geocoding HTTP call; resolves every lookup to Mumbai unless overridden."""
+    mocked = MagicMock()
+    mocked.return_value.json.return_value = [{"lat": "19.0760", "lon": "72.8777"}]
+    monkeypatch.setattr('app.requests.get', mocked)
+    return mocked
+
+
+@pytest.fixture
+def app_mocks(monkeypatch, mock_geocoding):
+    """
+    Replace geocoding, bcrypt and the Twilio client in one place.
+    bcrypt accepts every password by default; tests override attributes as needed.
+    """
+    bcrypt = MagicMock()
+    bcrypt.generate_password_hash.return_value = b'hashed'
+    bcrypt.check_password_hash.return_value = True
+    twilio = MagicMock()
+    twilio.return_value.messages.create.return_value = MagicMock(sid='SM123')
+    monkeypatch.setattr('app.bcrypt', bcrypt)
+    monkeypatch.setattr('app.Client', twilio)
+    return SimpleNamespace(geocoding=mock_geocoding, bcrypt=bcrypt, twilio=twilio)
+
+
+class FakeTwilio:
+    """Stand-in for app.send_twilio_sms that replays queued responses, then succeeds."""
+    
+    def __init__(self):
+        self.responses = deque()
+        self.calls = []
+        self._lock = threading.Lock()  # broadcasts send from a thread pool
+    
+    def fail_next(self, n, message="Simulated Twilio failure"):
+        """Queue `n` error responses ahead of the default success."""
+        self.responses.extend({"status": "error", "message": message} for _ in range(n))
+    
+    def __call__(self, to_number, title, message_body, client=None):
+        with self._lock:
+            self.calls.append(to_number)
+            if self.responses:
+                return self.responses.popleft()
+        return {"status": "success", "sid": "SM123"}
+    
+    @property
+    def call_count(self):
+        return len(self.calls)
+
+
+@pytest.fixture
+def fake_twilio(monkeypatch):
+    """Replace app.send_twilio_sms with a FakeTwilio for the test."""
+    fake = FakeTwilio()
+    monkeypatch.setattr('app.send_twilio_sms', fake)
+    return fake
+
+
 # Shared test data fixtures
 @pytest.fixture
-def sample_user_data():
-    """Provide sample user registration data."""
-    return {
-        "name": "Test User",
-        "email": "testuser@example.com",
-        "password": "SecurePass123!",
-        "phone": "+919876543210",
-        "city": "Mumbai",
-        "state": "Maharashtra"
-    }
+def next_object_id():
+    """Provide a cheap ObjectId generator for bulk mock documents."""
+    return _counter_object_id
 
 
 @pytest.fixture
-def sample_admin_data():
-    """Provide sample admin user data (ends with .admin@gmail.com)."""
-    return {
-        "name": "Admin User",
-        "email": "disaster.admin@gmail.com",
-        "password": "AdminPass123!",
-        "phone": "+919876543211",
-        "city": "Delhi",
-        "state": "Delhi"
-    }
+def user_id():
+    """Provide the shared sentinel id for single mock user documents."""
+    return USER_OID
 
 
 @pytest.fixture
-def sample_alert_data():
-    """Provide sample alert creation data."""
-    return {
-        "title": "Flood Warning",
-        "message": "Heavy flooding expected in low-lying areas. Please evacuate.",
-        "type": "flood",
-        "severity": "high",
-        "location": "Mumbai, Maharashtra",
-        "coordinates": {"lat": 19.0760, "lng": 72.8777}
-    }
+def alert_id():
+    """Provide the shared sentinel id for single mock alert documents."""
+    return ALERT_OID
+
+
+@pytest.fixture(scope="session")
+def auth_token(flask_app):
+    """Provide a signed JWT and its user id, created once per session."""
+    from flask_jwt_extended import create_access_token
+    user_id = _counter_object_id()
+    with flask_app.app_context():
+        token = create_access_token(identity=str(user_id))
+    return token, user_id
+
+
+@pytest.fixture(scope="session")
+def auth_headers(auth_token):
+    """Provide the Authorization header for auth_token, built once per session (read-only)."""
+    token, _ = auth_token
+    # Shared by every test, so a stray mutation must not leak into the next one
+    return MappingProxyType({"Authorization": f"Bearer {token}"})
+
+
+@pytest.fixture
+def signup_factory():
+    """Provide a factory for /api/signup payloads; keyword overrides replace defaults."""
+    def _make(**overrides):
+        return {**_SIGNUP_DEFAULTS, **overrides}
+    return _make
+
+
+@pytest.fixture
+def alert_factory():
+    """Provide a factory for /api/alerts payloads; keyword overrides replace defaults."""
+    def _make(**overrides):
+        # Fresh coordinates dict per payload; the shared default stays read-only
+        return {**_ALERT_DEFAULTS, "coordinates": dict(_ALERT_DEFAULTS["coordinates"]), **overrides}
+    return _make
+
+
+@pytest.fixture
+def user_record_factory():
+    """Provide a factory for user documents as stored in MongoDB."""
+    def _make(user_id=None, **overrides):
+        record = {
+            "_id": user_id if user_id is not None else USER_OID,
+            "name": "Test User",
+            "email": "test@example.com",
+            "phone": "+919876543210",
+            "location": {},
+            "isAuthorized": False,
+            "notificationPreferences": {}
+        }
+        record.update(overrides)
+        return record
+    return _make
 
 
 @pytest.fixture
@@ -10,13 +10,11 @@ Reference: IEEE 829 Test Case Specification
 """
 
 import pytest
-import sys
-from pathlib import Path
+import threading
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 from bson.objectid import ObjectId
-
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "Backend"))
+from pymongo.errors import DuplicateKeyError
 
 
 class TestUserAuthentication:
@@ -26,41 +24,18 @@ class TestUserAuthentication:
     """
     
     @pytest.fixture(autouse=True)
-    def setup(self):
+    def setup(self, flask_app, client, mock_mongo, app_mocks):
         """Setup test client with mocked dependencies."""
-        self.mongo_patcher = patch('app.mongo')
-        self.geocoding_patcher = patch('app.requests.get')
-        self.bcrypt_patcher = patch('app.bcrypt')
-        
-        self.mock_mongo = self.mongo_patcher.start()
-        self.mock_geocoding = self.geocoding_patcher.start()
-        self.mock_bcrypt = self.bcrypt_patcher.start()
-        
-        # Setup geocoding mock
-        mock_response = MagicMock()
-        mock_response.json.return_value = [{"lat": "19.0760", "lon": "72.8777"}]
-        self.mock_geocoding.return_value = mock_response
-        
-        # Setup bcrypt mock
-        self.mock_bcrypt.generate_password_hash.return_value = b'hashed_password'
-        self.mock_bcrypt.check_password_hash.return_value = True
-        
-        from app import app
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-        self.app = app
-        
-        yield
-        
-        self.mongo_patcher.stop()
-        self.geocoding_patcher.stop()
-        self.bcrypt_patcher.stop()
+        self.users = mock_mongo.db.users
+        self.mock_bcrypt = app_mocks.bcrypt
+        self.client = client
+        self.app = flask_app
     
     # =========================================================================
     # FT-001: User Signup - Success
     # Priority: P1 (Critical)
     # =========================================================================
-    def test_ft001_user_signup_success(self):
+    def test_ft001_user_signup_success(self, signup_factory):
         """
         Test ID: FT-001
         Priority: P1 - Critical
@@ -69,28 +44,10 @@ class TestUserAuthentication:
         """
         user_id = ObjectId()
         
-        self.mock_mongo.db.users.find_one.side_effect = [
-            None,  # Check if exists
-            {      # Return after insert
-                "_id": user_id,
-                "name": "Test User",
-                "email": "test@example.com",
-                "phone": "+919876543210",
-                "location": {"city": "Mumbai", "state": "Maharashtra"},
-                "isAuthorized": False,
-                "notificationPreferences": {"email": True, "sms": True, "push": True}
-            }
-        ]
-        self.mock_mongo.db.users.insert_one.return_value = MagicMock(inserted_id=user_id)
+        self.users.find_one.return_value = None  # User does not exist yet
+        self.users.insert_one.return_value = MagicMock(inserted_id=user_id)
         
-        response = self.client.post('/api/signup', json={
-            "name": "Test User",
-            "email": "test@example.com",
-            "password": "SecurePass123!",
-            "phone": "+919876543210",
-            "city": "Mumbai",
-            "state": "Maharashtra"
-        })
+        response = self.client.post('/api/signup', json=signup_factory())
         
         assert response.status_code == 201
         data = response.get_json()
@@ -102,26 +59,19 @@ class TestUserAuthentication:
     # FT-002: User Signup - Duplicate Email
     # Priority: P1 (Critical)
     # =========================================================================
-    def test_ft002_user_signup_duplicate_email(self):
+    def test_ft002_user_signup_duplicate_email(self, user_id, signup_factory):
         """
         Test ID: FT-002
         Priority: P1 - Critical
         Pre-conditions: User with email already exists
         Expected Result: 400 error - User already exists
         """
-        self.mock_mongo.db.users.find_one.return_value = {
-            "_id": ObjectId(),
+        self.users.find_one.return_value = {
+            "_id": user_id,
             "email": "test@example.com"
         }
         
-        response = self.client.post('/api/signup', json={
-            "name": "Test User",
-            "email": "test@example.com",
-            "password": "SecurePass123!",
-            "phone": "+919876543210",
-            "city": "Mumbai",
-            "state": "Maharashtra"
-        })
+        response = self.client.post('/api/signup', json=signup_factory())
         
         assert response.status_code == 400
         data = response.get_json()
@@ -131,16 +81,14 @@ class TestUserAuthentication:
     # FT-003: User Login - Success
     # Priority: P1 (Critical)
     # =========================================================================
-    def test_ft003_user_login_success(self):
+    def test_ft003_user_login_success(self, user_id):
         """
         Test ID: FT-003
         Priority: P1 - Critical
         Pre-conditions: User exists with correct password
         Expected Result: JWT token returned
         """
-        user_id = ObjectId()
-        
-        self.mock_mongo.db.users.find_one.return_value = {
+        self.users.find_one.return_value = {
             "_id": user_id,
             "name": "Test User",
             "email": "test@example.com",
@@ -165,7 +113,7 @@ class TestUserAuthentication:
     # FT-004: User Login - Invalid Password
     # Priority: P1 (Critical)
     # =========================================================================
-    def test_ft004_user_login_invalid_password(self):
+    def test_ft004_user_login_invalid_password(self, user_id):
         """
         Test ID: FT-004
         Priority: P1 - Critical
@@ -174,8 +122,8 @@ class TestUserAuthentication:
         """
         self.mock_bcrypt.check_password_hash.return_value = False
         
-        self.mock_mongo.db.users.find_one.return_value = {
-            "_id": ObjectId(),
+        self.users.find_one.return_value = {
+            "_id": user_id,
             "email": "test@example.com",
             "password": "hashed_password"
         }
@@ -198,7 +146,7 @@ class TestUserAuthentication:
         Pre-conditions: User does not exist
         Expected Result: 401 Unauthorized
         """
-        self.mock_mongo.db.users.find_one.return_value = None
+        self.users.find_one.return_value = None
         
         response = self.client.post('/api/login', json={
             "email": "nonexistent@example.com",
@@ -211,7 +159,7 @@ class TestUserAuthentication:
     # FT-006: Admin Authorization Check
     # Priority: P2 (High)
     # =========================================================================
-    def test_ft006_admin_authorization(self):
+    def test_ft006_admin_authorization(self, signup_factory):
         """
         Test ID: FT-006
         Priority: P2 - High
@@ -220,32 +168,40 @@ class TestUserAuthentication:
         """
         user_id = ObjectId()
         
-        self.mock_mongo.db.users.find_one.side_effect = [
-            None,
-            {
-                "_id": user_id,
-                "name": "Admin User",
-                "email": "disaster.admin@gmail.com",
-                "phone": "+919876543210",
-                "location": {},
-                "isAuthorized": True,
-                "notificationPreferences": {}
-            }
-        ]
-        self.mock_mongo.db.users.insert_one.return_value = MagicMock(inserted_id=user_id)
+        self.users.find_one.return_value = None  # User does not exist yet
+        self.users.insert_one.return_value = MagicMock(inserted_id=user_id)
         
-        response = self.client.post('/api/signup', json={
-            "name": "Admin User",
-            "email": "disaster.admin@gmail.com",
-            "password": "AdminPass123!",
-            "phone": "+919876543210",
-            "city": "Delhi",
-            "state": "Delhi"
-        })
+        response = self.client.post('/api/signup', json=signup_factory(
+            name="Admin User",
+            email="disaster.admin@gmail.com",
+            password="AdminPass123!",
+            city="Delhi",
+            state="Delhi"
+        ))
         
         assert response.status_code == 201
         data = response.get_json()
         assert data['user']['isAuthorized'] == True
+    
+    # =========================================================================
+    # FT-020: User Signup - Concurrent Duplicate Rejected by Index
+    # Priority: P1 (Critical)
+    # =========================================================================
+    def test_ft020_signup_duplicate_key_race(self, signup_factory):
+        """
+        Test ID: FT-020
+        Priority: P1 - Critical
+        Pre-conditions: Existence check passes, but a concurrent signup inserts the email first
+        Expected Result: 400 error - User already exists (not a 500)
+        """
+        self.users.find_one.return_value = None
+        self.users.insert_one.side_effect = DuplicateKeyError("E11000 duplicate key error")
+        
+        response = self.client.post('/api/signup', json=signup_factory())
+        
+        assert response.status_code == 400
+        data = response.get_json()
+        assert 'already exists' in data['msg'].lower()
 
 
 class TestAlertManagement:
@@ -255,125 +211,70 @@ class TestAlertManagement:
     """
     
     @pytest.fixture(autouse=True)
-    def setup(self):
+    def setup(self, client, mock_mongo, app_mocks):
         """Setup test client with mocked dependencies."""
-        self.mongo_patcher = patch('app.mongo')
-        self.geocoding_patcher = patch('app.requests.get')
-        self.bcrypt_patcher = patch('app.bcrypt')
-        self.twilio_patcher = patch('app.Client')
-        
-        self.mock_mongo = self.mongo_patcher.start()
-        self.mock_geocoding = self.geocoding_patcher.start()
-        self.mock_bcrypt = self.bcrypt_patcher.start()
-        self.mock_twilio = self.twilio_patcher.start()
-        
-        # Setup mocks
-        mock_response = MagicMock()
-        mock_response.json.return_value = [{"lat": "19.0760", "lon": "72.8777"}]
-        self.mock_geocoding.return_value = mock_response
-        
-        self.mock_bcrypt.check_password_hash.return_value = True
-        
-        mock_twilio_instance = MagicMock()
-        mock_twilio_instance.messages.create.return_value = MagicMock(sid='SM123')
-        self.mock_twilio.return_value = mock_twilio_instance
-        
-        from app import app
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-        
-        yield
-        
-        self.mongo_patcher.stop()
-        self.geocoding_patcher.stop()
-        self.bcrypt_patcher.stop()
-        self.twilio_patcher.stop()
-    
-    def _login(self):
-        """Helper to login and get token."""
-        user_id = ObjectId()
-        self.mock_mongo.db.users.find_one.return_value = {
-            "_id": user_id,
-            "name": "Test User",
-            "email": "test@test.com",
-            "password": "hashed",
-            "phone": "+919876543210",
-            "location": {},
-            "isAuthorized": True,
-            "notificationPreferences": {}
-        }
-        
-        response = self.client.post('/api/login', json={
-            "email": "test@test.com",
-            "password": "password"
-        })
-        return response.get_json()['token'], user_id
+        self.alerts = mock_mongo.db.alerts
+        self.users = mock_mongo.db.users
+        self.client = client
     
     # =========================================================================
     # FT-007: Create Alert - Success
     # Priority: P1 (Critical)
     # =========================================================================
-    def test_ft007_create_alert_success(self):
+    def test_ft007_create_alert_success(self, auth_token, auth_headers, alert_id, alert_factory):
         """
         Test ID: FT-007
         Priority: P1 - Critical
         Pre-conditions: Authenticated user, valid alert data
         Expected Result: Alert created and returned
         """
-        token, user_id = self._login()
-        alert_id = ObjectId()
+        _, user_id = auth_token
         
-        self.mock_mongo.db.alerts.find.return_value = []
-        self.mock_mongo.db.alerts.insert_one.return_value = MagicMock(inserted_id=alert_id)
-        self.mock_mongo.db.alerts.find_one.return_value = {
-            "_id": alert_id,
-            "user_id": user_id,
-            "title": "Flood Warning",
-            "message": "Heavy flooding expected",
-            "type": "flood",
-            "severity": "high",
-            "location": "Mumbai, Maharashtra",
-            "coordinates": {"lat": 19.0760, "lng": 72.8777},
-            "status": "active",
-            "timestamp": datetime.utcnow(),
-            "sms_sent": True
-        }
-        self.mock_mongo.db.users.find.return_value = []
+        self.alerts.find.return_value = []
+        self.alerts.insert_one.return_value = MagicMock(inserted_id=alert_id)
+        self.users.find.return_value = []
         
         response = self.client.post(
             '/api/alerts',
-            json={
-                "title": "Flood Warning",
-                "message": "Heavy flooding expected",
-                "type": "flood",
-                "severity": "high",
-                "location": "Mumbai, Maharashtra",
-                "coordinates": {"lat": 19.0760, "lng": 72.8777}
-            },
-            headers={"Authorization": f"Bearer {token}"}
+            json=alert_factory(),
+            headers=auth_headers
         )
         
         assert response.status_code == 201
         data = response.get_json()
         assert data['title'] == "Flood Warning"
+        assert data['id'] == str(alert_id)
+        assert data['user_id'] == str(user_id)
+        # Response is built from the inserted document, not re-read
+        self.alerts.find_one.assert_not_called()
+        
+        # Duplicate window is measured from the stored alert's own timestamp
+        stored_alert = self.alerts.insert_one.call_args[0][0]
+        window_start = self.alerts.find.call_args[0][0]["timestamp"]["$gte"]
+        assert stored_alert["timestamp"] - window_start == timedelta(hours=12)
     
     # =========================================================================
     # FT-008: Get Alerts - With Filters
     # Priority: P2 (High)
     # =========================================================================
-    def test_ft008_get_alerts_with_filters(self):
+    @pytest.mark.parametrize("time_filter,window", [
+        ("24h", timedelta(hours=24)),
+        ("7d", timedelta(days=7)),
+        ("30d", timedelta(days=30)),
+    ])
+    def test_ft008_get_alerts_with_filters(self, auth_token, auth_headers, alert_id, time_filter, window):
         """
         Test ID: FT-008
         Priority: P2 - High
         Pre-conditions: Alerts exist in database
-        Expected Result: Filtered alerts returned
+        Expected Result: Filtered alerts returned, cutoff matches the time window
         """
-        token, user_id = self._login()
+        _, user_id = auth_token
         
         mock_cursor = MagicMock()
         mock_cursor.sort.return_value = [
             {
-                "_id": ObjectId(),
+                "_id": alert_id,
                 "user_id": user_id,
                 "title": "Flood Alert",
                 "message": "Test",
@@ -386,16 +287,22 @@ class TestAlertManagement:
                 "sms_sent": True
             }
         ]
-        self.mock_mongo.db.alerts.find.return_value = mock_cursor
+        self.alerts.find.return_value = mock_cursor
         
+        before = datetime.utcnow()
         response = self.client.get(
-            '/api/alerts?time=24h&type=flood',
-            headers={"Authorization": f"Bearer {token}"}
+            f'/api/alerts?time={time_filter}&type=flood',
+            headers=auth_headers
         )
+        after = datetime.utcnow()
         
         assert response.status_code == 200
         data = response.get_json()
         assert isinstance(data, list)
+        
+        query = self.alerts.find.call_args[0][0]
+        assert before - window <= query["timestamp"]["$gte"] <= after - window
+        assert query["type"] == "flood"
 
 
 class TestSMSNotification:
@@ -405,14 +312,10 @@ class TestSMSNotification:
     """
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """Setup test client with mocked dependencies."""
-        self.mongo_patcher = patch('app.mongo')
-        self.mock_mongo = self.mongo_patcher.start()
-        
-        yield
-        
-        self.mongo_patcher.stop()
+    def setup(self, mock_mongo):
+        """Use the shared database mock; every test in this suite touches storage."""
+        self.alerts = mock_mongo.db.alerts
+        self.users = mock_mongo.db.users
     
     # =========================================================================
     # FT-009: SMS Triggered for New Alert
@@ -425,7 +328,7 @@ class TestSMSNotification:
         Pre-conditions: No recent alerts in area
         Expected Result: SMS should be sent
         """
-        self.mock_mongo.db.alerts.find.return_value = []
+        self.alerts.find.return_value = []
         
         from app import should_trigger_sms
         result = should_trigger_sms({"lat": 19.0760, "lng": 72.8777})
@@ -436,16 +339,16 @@ class TestSMSNotification:
     # FT-010: SMS Suppressed for Duplicate Alert
     # Priority: P1 (Critical)
     # =========================================================================
-    def test_ft010_sms_suppressed_duplicate(self):
+    def test_ft010_sms_suppressed_duplicate(self, alert_id):
         """
         Test ID: FT-010
         Priority: P1 - Critical
         Pre-conditions: Recent alert exists within radius
         Expected Result: SMS should be suppressed
         """
-        self.mock_mongo.db.alerts.find.return_value = [
+        self.alerts.find.return_value = [
             {
-                "_id": ObjectId(),
+                "_id": alert_id,
                 "coordinates": {"lat": 19.0760, "lng": 72.8777},
                 "timestamp": datetime.utcnow(),
                 "sms_sent": True
@@ -454,9 +357,195 @@ class TestSMSNotification:
         
         from app import should_trigger_sms
         result = should_trigger_sms({"lat": 19.0760, "lng": 72.8777})
-        
+
         assert result == False
 
+    # =========================================================================
+    # FT-013: Channels Suppressed Independently
+    # Priority: P1 (Critical)
+    # =========================================================================
+    def test_ft013_channels_suppressed_independently(self, alert_id):
+        """
+        Test ID: FT-013
+        Priority: P1 - Critical
+        Pre-conditions: Recent nearby alert sent SMS but no email
+        Expected Result: SMS suppressed, email still sent, single query issued
+        """
+        self.alerts.find.return_value = [
+            {
+                "_id": alert_id,
+                "coordinates": {"lat": 19.0760, "lng": 72.8777},
+                "timestamp": datetime.utcnow(),
+                "sms_sent": True,
+                "email_sent": False
+            }
+        ]
+
+        from app import should_trigger_notifications
+        trigger_sms, trigger_email = should_trigger_notifications({"lat": 19.0760, "lng": 72.8777})
+
+        assert trigger_sms == False
+        assert trigger_email == True
+        assert self.alerts.find.call_count == 1
+
+    # =========================================================================
+    # FT-014: Each Broadcast Worker Owns One Twilio Client
+    # Priority: P3 (Medium)
+    # =========================================================================
+    def test_ft014_broadcast_client_per_worker(self, flask_app, next_object_id):
+        """
+        Test ID: FT-014
+        Priority: P3 - Medium
+        Pre-conditions: Twilio credentials configured, several nearby users
+        Expected Result: One client per pool thread, never shared between threads
+        """
+        num_users = 3
+        self.users.find.return_value = [
+            {"_id": next_object_id(), "phone": f"+91987654321{i}", "location": {"coordinates": {"lat": 19.0, "lng": 72.8}}}
+            for i in range(num_users)
+        ]
+        # Hold every send until all workers are busy, so each gets a message
+        all_started = threading.Barrier(num_users, timeout=2)
+        clients = []
+        clients_lock = threading.Lock()
+        sending_threads = {}
+
+        def build_client(*args):
+            client = MagicMock()
+            with clients_lock:
+                index = len(clients)
+                clients.append(client)
+
+            def create(**kwargs):
+                sending_threads.setdefault(index, set()).add(threading.get_ident())
+                all_started.wait()
+                return MagicMock(sid='SM123')
+
+            client.messages.create.side_effect = create
+            return client
+
+        credentials = {"TWILIO_ACCOUNT_SID": "AC123", "TWILIO_AUTH_TOKEN": "token"}
+        with patch.dict(flask_app.config, credentials), patch('app.Client', side_effect=build_client):
+            from app import broadcast_sms_to_users
+            result = broadcast_sms_to_users({
+                "title": "Test",
+                "message": "Test",
+                "coordinates": {"lat": 19.0, "lng": 72.8}
+            })
+
+        assert result == True
+        assert len(clients) == num_users
+        assert sum(client.messages.create.call_count for client in clients) == num_users
+        # Each client only ever sent from the thread that built it
+        assert all(len(threads) == 1 for threads in sending_threads.values())
+        assert len({next(iter(threads)) for threads in sending_threads.values()}) == num_users
+
+    # =========================================================================
+    # FT-015: Recipients Split by Channel in One Pass
+    # Priority: P2 (High)
+    # =========================================================================
+    def test_ft015_recipients_split_by_channel(self, next_object_id):
+        """
+        Test ID: FT-015
+        Priority: P2 - High
+        Pre-conditions: Nearby users with mixed contact details and preferences
+        Expected Result: Correct SMS/email recipient lists from one users query
+        """
+        near = {"coordinates": {"lat": 19.0, "lng": 72.8}}
+        self.users.find.return_value = [
+            {"_id": next_object_id(), "phone": "+919876543210", "email": "a@example.com", "location": near},
+            {"_id": next_object_id(), "phone": "+919876543211", "email": "b@example.com", "location": near,
+             "notificationPreferences": {"email": False}},
+            {"_id": next_object_id(), "phone": "", "email": "c@example.com", "location": near},
+            {"_id": next_object_id(), "phone": "+919876543212", "email": "d@example.com",
+             "location": {"coordinates": {"lat": 28.6139, "lng": 77.2090}}},
+        ]
+
+        from app import find_alert_recipients
+        sms_recipients, email_recipients = find_alert_recipients({"coordinates": {"lat": 19.0, "lng": 72.8}})
+
+        assert [u["phone"] for u in sms_recipients] == ["+919876543210", "+919876543211"]
+        assert [u["email"] for u in email_recipients] == ["a@example.com", "c@example.com"]
+        assert self.users.find.call_count == 1
+
+    # =========================================================================
+    # FT-016: Duplicate Query Narrowed to Latitude Band
+    # Priority: P2 (High)
+    # =========================================================================
+    def test_ft016_duplicate_query_latitude_band(self):
+        """
+        Test ID: FT-016
+        Priority: P2 - High
+        Pre-conditions: New alert near Mumbai
+        Expected Result: Query band still covers a point exactly one radius away
+        """
+        from geopy.distance import geodesic
+        self.alerts.find.return_value = []
+
+        from app import should_trigger_notifications, CONSTANTS
+        origin = (19.0760, 72.8777)
+        should_trigger_notifications({"lat": origin[0], "lng": origin[1]})
+
+        lat_band = self.alerts.find.call_args[0][0]["coordinates.lat"]
+        radius_km = CONSTANTS["DUPLICATE_CHECK_RADIUS_KM"]
+        north = geodesic(kilometers=radius_km).destination(origin, 0).latitude
+        south = geodesic(kilometers=radius_km).destination(origin, 180).latitude
+        assert lat_band["$gte"] <= south < north <= lat_band["$lte"]
+
+    # =========================================================================
+    # FT-017: Broadcast Sends Overlap
+    # Priority: P2 (High)
+    # =========================================================================
+    def test_ft017_broadcast_sends_overlap(self, next_object_id):
+        """
+        Test ID: FT-017
+        Priority: P2 - High
+        Pre-conditions: Several nearby users, each send blocks until all have started
+        Expected Result: Sends run concurrently, so every user is notified
+        """
+        num_users = 3
+        recipients = [
+            {"_id": next_object_id(), "phone": f"+91987654321{i}", "location": {"coordinates": {"lat": 19.0, "lng": 72.8}}}
+            for i in range(num_users)
+        ]
+        # A serial loop would break the barrier on its first send
+        all_started = threading.Barrier(num_users, timeout=2)
+
+        def blocking_send(*args, **kwargs):
+            all_started.wait()
+            return {"status": "success", "sid": "SM123"}
+
+        with patch('app.send_twilio_sms', side_effect=blocking_send) as mock_sms:
+            from app import broadcast_sms_to_users
+            result = broadcast_sms_to_users({"title": "Test", "message": "Test"}, recipients=recipients)
+
+        assert result == True
+        assert mock_sms.call_count == num_users
+
+    # =========================================================================
+    # FT-018: Haversine Screening Matches Geodesic
+    # Priority: P2 (High)
+    # =========================================================================
+    @pytest.mark.parametrize("destination", [
+        (19.0760, 72.8777),                # Same point
+        (18.5204, 73.8567),                # Pune, ~120km
+        (21.0, 72.8777),                   # Due north, just past SMS radius
+        (28.6139, 77.2090),                # Delhi, ~1150km
+    ])
+    def test_ft018_haversine_matches_geodesic(self, destination):
+        """
+        Test ID: FT-018
+        Priority: P2 - High
+        Pre-conditions: Alert in Mumbai, users at known distances
+        Expected Result: Recipient screening distance within 0.5% of geodesic
+        """
+        from geopy.distance import geodesic
+        from app import haversine_km
+
+        origin = (19.0760, 72.8777)
+        expected = geodesic(origin, destination).km
+        assert haversine_km(*origin, *destination) == pytest.approx(expected, rel=0.005, abs=1e-6)
+
 
 class TestGeocoding:
     """
@@ -507,3 +596,28 @@ class TestGeocoding:
             
             assert result['lat'] == CONSTANTS['DEFAULT_LAT']
             assert result['lng'] == CONSTANTS['DEFAULT_LNG']
+    
+    # =========================================================================
+    # FT-019: Geocoding Cache
+    # Priority: P3 (Medium)
+    # =========================================================================
+    def test_ft019_geocoding_cache(self):
+        """
+        Test ID: FT-019
+        Priority: P3 - Medium
+        Pre-conditions: Same place looked up repeatedly, first lookup fails
+        Expected Result: Failure not cached; after one success no further requests
+        """
+        with patch('app.requests.get') as mock_get:
+            mock_get.return_value.json.side_effect = [
+                Exception("Timeout"),
+                [{"lat": "28.6139", "lon": "77.2090"}],
+            ]
+            
+            from app import get_coordinates, CONSTANTS
+            assert get_coordinates("Delhi", "Delhi")['lat'] == CONSTANTS['DEFAULT_LAT']
+            
+            results = [get_coordinates("Delhi", "Delhi") for _ in range(3)]
+            
+            assert all(r == {"lat": 28.6139, "lng": 77.2090} for r in results)
+            assert mock_get.call_count == 2
@@ -13,20 +13,36 @@ Reference: ISO/IEC/IEEE 29119, ISTQB Test Metrics
 """
 
 import argparse
+import importlib.util
 import json
-import os
 import subprocess
 import sys
-import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import List, NamedTuple, Optional
 
+# lxml parses large reports faster; the stdlib parser has the same iterparse API
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
 
-@dataclass
-class TestResult:
-    """Represents a single test result."""
+# ijson reads only the coverage total instead of loading the whole report
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# orjson pretty-prints the JSON report much faster than the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class TestResult(NamedTuple):
+    """Represents a single test result (a tuple: no per-instance __dict__)."""
     name: str
     classname: str
     time: float
@@ -47,6 +63,7 @@ class EvaluationMetrics:
     defect_density: float
     execution_time: float
     status: str  # CRITICAL_FAILURE, STABLE, PROD_READY
+    failed_tests: List[TestResult] = field(default_factory=list, repr=False)  # failed + error
 
 
 class TestEvaluator:
@@ -73,19 +90,33 @@ class TestEvaluator:
         self.project_root = project_root
         self.tests_dir = project_root / "tests"
         self.reports_dir = project_root / "reports"
-        self.reports_dir.mkdir(exist_ok=True)
+        # A single stat in the usual case where reports/ already exists
+        if not self.reports_dir.is_dir():
+            self.reports_dir.mkdir(exist_ok=True)
         
         self.junit_xml = self.reports_dir / "junit_report.xml"
         self.coverage_xml = self.reports_dir / "coverage.xml"
         self.coverage_json = self.reports_dir / "coverage.json"
+        
+        # Set by evaluate() so the banner, printed report and JSON share one timestamp
+        self._run_timestamp: Optional[str] = None
     
-    def run_tests(self, markers: Optional[List[str]] = None, verbose: bool = True) -> int:
+    def _timestamp(self) -> str:
+        """Return the current evaluate() run's timestamp, or now outside a run."""
+        return self._run_timestamp or datetime.now().isoformat()
+    
+    def run_tests(self, markers: Optional[List[str]] = None, verbose: bool = True,
+                  jobs: str = "0", emit_xml: bool = False,
+                  timeout: Optional[float] = None) -> int:
         """
         Execute pytest with coverage.
         
         Args:
             markers: Optional list of pytest markers to filter tests
             verbose: Enable verbose output
+            jobs: pytest-xdist worker count ("auto" or a number); "0" (default) runs serially
+            emit_xml: Also write coverage.xml (only the JSON report is parsed here)
+            timeout: Seconds before the pytest run is killed (None waits indefinitely)
             
         Returns:
             pytest exit code
@@ -93,7 +124,7 @@ class TestEvaluator:
         print("=" * 60)
         print("DAS EVALUATION FRAMEWORK")
         print("=" * 60)
-        print(f"Timestamp: {datetime.now().isoformat()}")
+        print(f"Timestamp: {self._timestamp()}")
         print(f"Project Root: {self.project_root}")
         print("-" * 60)
         
@@ -102,19 +133,32 @@ class TestEvaluator:
             str(self.tests_dir),
             f"--junitxml={self.junit_xml}",
             f"--cov={self.project_root / 'src'}",
-            f"--cov-report=xml:{self.coverage_xml}",
             f"--cov-report=json:{self.coverage_json}",
-            "--cov-report=term",
             "-v" if verbose else "-q",
         ]
         
+        # Each coverage report re-serializes the whole data file; only JSON is required
+        if emit_xml:
+            cmd.append(f"--cov-report=xml:{self.coverage_xml}")
+        if verbose:
+            cmd.append("--cov-report=term")
+        
         if markers:
             cmd.extend(["-m", " or ".join(markers)])
         
+        # Opt-in: worker start-up costs more than this suite saves, so serial is the default
+        if jobs != "0" and importlib.util.find_spec("xdist") is not None:
+            cmd.extend(["-n", jobs, "--dist=loadfile"])
+        
         print(f"\nRunning: {' '.join(cmd)}\n")
         print("-" * 60)
         
-        result = subprocess.run(cmd, cwd=self.project_root)
+        # pytest inherits our stdout, so its output already streams live
+        try:
+            result = subprocess.run(cmd, cwd=self.project_root, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            print(f"\nERROR: pytest did not finish within {timeout}s and was killed")
+            return 124
         
         return result.returncode
     
@@ -124,46 +168,44 @@ class TestEvaluator:
             print(f"ERROR: JUnit XML not found at {self.junit_xml}")
             return []
         
-        tree = ET.parse(self.junit_xml)
-        root = tree.getroot()
-        
         results = []
+        append = results.append
         
-        for testcase in root.iter("testcase"):
-            name = testcase.get("name", "unknown")
-            classname = testcase.get("classname", "unknown")
-            time_str = testcase.get("time", "0")
+        # Stream the report and look at each testcase's children once;
+        # failure outranks error, which outranks skipped
+        for _, testcase in ET.iterparse(str(self.junit_xml), events=("end",)):
+            if testcase.tag != "testcase":
+                continue
             
             try:
-                time_val = float(time_str)
+                time_val = float(testcase.get("time", "0"))
             except ValueError:
                 time_val = 0.0
             
             # Determine status
-            failure = testcase.find("failure")
-            error = testcase.find("error")
-            skipped = testcase.find("skipped")
-            
-            if failure is not None:
-                status = "failed"
-                message = failure.get("message", failure.text)
-            elif error is not None:
-                status = "error"
-                message = error.get("message", error.text)
-            elif skipped is not None:
-                status = "skipped"
-                message = skipped.get("message", "")
-            else:
-                status = "passed"
-                message = None
+            status = "passed"
+            message = None
+            for child in testcase:
+                tag = child.tag
+                if tag == "failure":
+                    status = "failed"
+                    message = child.get("message", child.text)
+                    break
+                if tag == "error" and status != "error":
+                    status = "error"
+                    message = child.get("message", child.text)
+                elif tag == "skipped" and status == "passed":
+                    status = "skipped"
+                    message = child.get("message", "")
             
-            results.append(TestResult(
-                name=name,
-                classname=classname,
+            append(TestResult(
+                name=testcase.get("name", "unknown"),
+                classname=testcase.get("classname", "unknown"),
                 time=time_val,
                 status=status,
                 failure_message=message
             ))
+            testcase.clear()
         
         return results
     
@@ -174,6 +216,12 @@ class TestEvaluator:
             return 0.0
         
         try:
+            if ijson is not None:
+                with open(self.coverage_json, "rb") as f:
+                    for value in ijson.items(f, "totals.percent_covered"):
+                        return float(value)
+                return 0.0
+            
             with open(self.coverage_json, "r") as f:
                 data = json.load(f)
             
@@ -185,12 +233,24 @@ class TestEvaluator:
     def calculate_metrics(self, results: List[TestResult], coverage: float) -> EvaluationMetrics:
         """Calculate all evaluation metrics."""
         total = len(results)
-        passed = sum(1 for r in results if r.status == "passed")
-        failed = sum(1 for r in results if r.status == "failed")
-        skipped = sum(1 for r in results if r.status == "skipped")
-        errors = sum(1 for r in results if r.status == "error")
         
-        execution_time = sum(r.time for r in results)
+        # One pass over the results for every count and the total time
+        passed = failed = skipped = errors = 0
+        execution_time = 0.0
+        failed_tests = []
+        for r in results:
+            outcome = r.status
+            if outcome == "passed":
+                passed += 1
+            elif outcome == "failed":
+                failed += 1
+                failed_tests.append(r)
+            elif outcome == "skipped":
+                skipped += 1
+            elif outcome == "error":
+                errors += 1
+                failed_tests.append(r)
+            execution_time += r.time
         
         # Success rate (excluding skipped)
         executed = total - skipped
@@ -212,7 +272,8 @@ class TestEvaluator:
             code_coverage=round(coverage, 2),
             defect_density=round(defect_density, 4),
             execution_time=round(execution_time, 3),
-            status=status
+            status=status,
+            failed_tests=failed_tests
         )
     
     def _determine_status(self, success_rate: float, coverage: float, defect_density: float) -> str:
@@ -240,63 +301,59 @@ class TestEvaluator:
             "CRITICAL_FAILURE": "[FAIL]"
         }
         
-        report = []
-        report.append("\n" + "=" * 60)
-        report.append("EVALUATION REPORT")
-        report.append("=" * 60)
-        report.append(f"Generated: {datetime.now().isoformat()}")
-        report.append("")
-        
-        # Status banner
         emoji = status_emoji.get(metrics.status, "❓")
-        report.append(f"STATUS: {emoji} {metrics.status} {emoji}")
-        report.append("")
-        
-        # Metrics table
-        report.append("-" * 40)
-        report.append("METRICS SUMMARY")
-        report.append("-" * 40)
-        report.append(f"  Total Tests:       {metrics.total_tests}")
-        report.append(f"  Passed:            {metrics.passed}")
-        report.append(f"  Failed:            {metrics.failed}")
-        report.append(f"  Errors:            {metrics.errors}")
-        report.append(f"  Skipped:           {metrics.skipped}")
-        report.append(f"  Success Rate:      {metrics.success_rate}%")
-        report.append(f"  Code Coverage:     {metrics.code_coverage}%")
-        report.append(f"  Defect Density:    {metrics.defect_density}")
-        report.append(f"  Execution Time:    {metrics.execution_time}s")
-        report.append("")
-        
-        # Thresholds reference
-        report.append("-" * 40)
-        report.append("THRESHOLD REFERENCE")
-        report.append("-" * 40)
-        report.append("  PROD_READY:")
-        report.append(f"    - Success Rate >= {self.THRESHOLDS['prod_ready']['success_rate']}%")
-        report.append(f"    - Code Coverage >= {self.THRESHOLDS['prod_ready']['code_coverage']}%")
-        report.append(f"    - Defect Density <= {self.THRESHOLDS['prod_ready']['max_defect_density']}")
-        report.append("  STABLE:")
-        report.append(f"    - Success Rate >= {self.THRESHOLDS['stable']['success_rate']}%")
-        report.append(f"    - Code Coverage >= {self.THRESHOLDS['stable']['code_coverage']}%")
-        report.append(f"    - Defect Density <= {self.THRESHOLDS['stable']['max_defect_density']}")
-        report.append("")
+        prod = self.THRESHOLDS["prod_ready"]
+        stable = self.THRESHOLDS["stable"]
+        rule = "-" * 40
+        
+        # Status banner, metrics table and thresholds reference
+        report = f"""
+{"=" * 60}
+EVALUATION REPORT
+{"=" * 60}
+Generated: {self._timestamp()}
+
+STATUS: {emoji} {metrics.status} {emoji}
+
+{rule}
+METRICS SUMMARY
+{rule}
+  Total Tests:       {metrics.total_tests}
+  Passed:            {metrics.passed}
+  Failed:            {metrics.failed}
+  Errors:            {metrics.errors}
+  Skipped:           {metrics.skipped}
+  Success Rate:      {metrics.success_rate}%
+  Code Coverage:     {metrics.code_coverage}%
+  Defect Density:    {metrics.defect_density}
+  Execution Time:    {metrics.execution_time}s
+
+{rule}
+THRESHOLD REFERENCE
+{rule}
+  PROD_READY:
+    - Success Rate >= {prod['success_rate']}%
+    - Code Coverage >= {prod['code_coverage']}%
+    - Defect Density <= {prod['max_defect_density']}
+  STABLE:
+    - Success Rate >= {stable['success_rate']}%
+    - Code Coverage >= {stable['code_coverage']}%
+    - Defect Density <= {stable['max_defect_density']}
+
+"""
         
         # Failed tests details
         if failed_tests:
-            report.append("-" * 40)
-            report.append("FAILED TESTS DETAIL")
-            report.append("-" * 40)
+            details = [rule, "FAILED TESTS DETAIL", rule]
             for test in failed_tests:
-                report.append(f"  [X] {test.classname}::{test.name}")
+                details.append(f"  [X] {test.classname}::{test.name}")
                 if test.failure_message:
                     # Truncate long messages
                     msg = test.failure_message[:200] + "..." if len(test.failure_message) > 200 else test.failure_message
-                    report.append(f"      └─ {msg}")
-            report.append("")
+                    details.append(f"      └─ {msg}")
+            report += "\n".join(details) + "\n\n"
         
-        report.append("=" * 60)
-        
-        return "\n".join(report)
+        return report + "=" * 60
     
     def save_json_report(self, metrics: EvaluationMetrics, filepath: Optional[Path] = None) -> None:
         """Save metrics as JSON for CI/CD integration."""
@@ -304,7 +361,7 @@ class TestEvaluator:
             filepath = self.reports_dir / "evaluation_report.json"
         
         data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._timestamp(),
             "status": metrics.status,
             "metrics": {
                 "total_tests": metrics.total_tests,
@@ -320,24 +377,38 @@ class TestEvaluator:
             "thresholds": self.THRESHOLDS,
         }
         
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=2)
+        if orjson is not None:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, indent=2).encode()
+        
+        # Write beside the target then rename, so an interrupted run never leaves half a report
+        tmp_path = filepath.with_name(filepath.name + ".tmp")
+        tmp_path.write_bytes(payload)
+        tmp_path.replace(filepath)
         
         print(f"JSON report saved to: {filepath}")
     
-    def evaluate(self, run_tests: bool = True, markers: Optional[List[str]] = None) -> EvaluationMetrics:
+    def evaluate(self, run_tests: bool = True, markers: Optional[List[str]] = None,
+                 jobs: str = "0", emit_xml: bool = False,
+                 timeout: Optional[float] = None) -> EvaluationMetrics:
         """
         Main evaluation pipeline.
         
         Args:
             run_tests: If True, run pytest. If False, parse existing reports.
             markers: Optional pytest markers to filter tests
+            jobs: pytest-xdist worker count passed to run_tests
+            emit_xml: Also write the coverage XML report
+            timeout: Seconds allowed for the pytest run
             
         Returns:
             EvaluationMetrics object
         """
+        self._run_timestamp = datetime.now().isoformat()
+        
         if run_tests:
-            exit_code = self.run_tests(markers)
+            exit_code = self.run_tests(markers, jobs=jobs, emit_xml=emit_xml, timeout=timeout)
             print(f"\nPytest exit code: {exit_code}")
         
         # Parse results
@@ -347,11 +418,8 @@ class TestEvaluator:
         # Calculate metrics
         metrics = self.calculate_metrics(results, coverage)
         
-        # Get failed tests for detail report
-        failed_tests = [r for r in results if r.status in ("failed", "error")]
-        
         # Generate and print report
-        report = self.generate_report(metrics, failed_tests)
+        report = self.generate_report(metrics, metrics.failed_tests)
         print(report)
         
         # Save JSON report
@@ -371,6 +439,7 @@ Examples:
   python evaluator.py --no-run           # Evaluate existing reports only
   python evaluator.py -m functional      # Run only functional tests
   python evaluator.py -m "safety stress" # Run safety and stress tests
+  python evaluator.py --jobs auto        # Run tests on pytest-xdist workers
         """
     )
     
@@ -393,6 +462,24 @@ Examples:
         help="Pytest markers to filter tests (e.g., functional integration)"
     )
     
+    parser.add_argument(
+        "-j", "--jobs",
+        default="0",
+        help="Parallel pytest-xdist workers: 'auto', a number, or 0 for serial (default: 0)"
+    )
+    
+    parser.add_argument(
+        "--emit-xml",
+        action="store_true",
+        help="Also write coverage.xml (e.g. for CI coverage upload)"
+    )
+    
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Kill the pytest run after this many seconds"
+    )
+    
     parser.add_argument(
         "--json-output",
         type=Path,
@@ -406,7 +493,10 @@ Examples:
     try:
         metrics = evaluator.evaluate(
             run_tests=not args.no_run,
-            markers=args.markers
+            markers=args.markers,
+            jobs=args.jobs,
+            emit_xml=args.emit_xml,
+            timeout=args.timeout
         )
         
         if args.json_output: